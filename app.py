@@ -6,15 +6,28 @@ with comprehensive filtering, search capabilities, and dynamic visualizations.
 """
 
 import dash
-from dash import dcc, html, Input, Output, State, callback
-import plotly.express as px
+from dash import dcc, html, Input, Output, State, callback, clientside_callback
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import functools
+import json
+import logging
 import os
-import re
 import sys
 from datetime import datetime
 
+from filter_options import DROPDOWN_OPTIONS_PATH, INJURY_FLAGS, get_dropdown_options, parse_number_column
+
+# Errors are logged with tracebacks; set LOG_LEVEL=WARNING in production to
+# drop the informational startup messages
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'),
+                    format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+log = logging.getLogger('dashboard')
+
 # Fix Windows console encoding issues
 if sys.platform == 'win32':
     try:
@@ -26,332 +39,788 @@ if sys.platform == 'win32':
 # DATA LOADING AND PREPROCESSING
 # ============================================================================
 
+DATA_PATH = os.path.join('data', 'df_merged_clean.parquet')
+# Borough-partitioned dataset written by convert_to_parquet.py (preferred when present)
+DATASET_DIR = os.path.join('data', 'df_merged_clean')
+
+# Coordinates, kept as float32 (about 7 significant digits is plenty for a map)
+COORD_COLS = ['LATITUDE', 'LONGITUDE']
+
+# Map raster: NYC bounding box (lat_min, lat_max, lon_min, lon_max) and grid
+# cells per side (~300m cells); every crash gets its cell index at load
+NYC_BOUNDS = (40.49, 40.92, -74.27, -73.68)
+MAP_GRID_SIZE = 150
+
+# Small non-negative integer columns, downcast to the narrowest unsigned type
+# (some are stored as strings, so they are coerced first)
+COUNT_COLS = [
+    'NUMBER_OF_PERSONS_INJURED', 'NUMBER_OF_PERSONS_KILLED',
+    'NUMBER_OF_PEDESTRIANS_INJURED', 'NUMBER_OF_PEDESTRIANS_KILLED',
+    'NUMBER_OF_CYCLIST_INJURED', 'NUMBER_OF_CYCLIST_KILLED',
+    'NUMBER_OF_MOTORIST_INJURED', 'NUMBER_OF_MOTORIST_KILLED',
+    'TOTAL_INJURED', 'TOTAL_KILLED', 'CRASH_HOUR'
+]
+
+# Low-cardinality string columns decoded as pandas categoricals
+CATEGORY_COLS = [
+    'BOROUGH', 'VEHICLE_TYPE_CODE_1', 'VEHICLE_TYPE_CODE_2',
+    'CONTRIBUTING_FACTOR_VEHICLE_1', 'CONTRIBUTING_FACTOR_VEHICLE_2'
+]
+
+# Paired columns that share one category set (same codes in both)
+CATEGORY_PAIRS = [
+    ('VEHICLE_TYPE_CODE_1', 'VEHICLE_TYPE_CODE_2'),
+    ('CONTRIBUTING_FACTOR_VEHICLE_1', 'CONTRIBUTING_FACTOR_VEHICLE_2')
+]
+
+# Month names in calendar order; CRASH_MONTH is loaded as an ordered
+# categorical over these, so month counts come out already sorted
+MONTH_ORDER = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+# Only the columns the dashboard reads are pulled from disk
+PROJECTION = COORD_COLS + COUNT_COLS + CATEGORY_COLS + [
+    'CRASH_YEAR', 'CRASH_MONTH', 'CRASH_WEEKDAY'
+] + [flag for flag, _, _ in INJURY_FLAGS.values()]
+
+def projected_columns(names):
+    """
+    The PROJECTION columns to read from a file with the given column names.
+    Columns only needed to derive something the file already stores are
+    skipped: per-type counts when the injury flag is present, and per-person
+    counts when the matching TOTAL_ column is.
+    """
+    names = set(names)
+    derived = {
+        col for flag, injured, killed in INJURY_FLAGS.values() if flag in names
+        for col in (injured, killed)
+    }
+    derived |= {
+        col for total, col in (('TOTAL_INJURED', 'NUMBER_OF_PERSONS_INJURED'),
+                               ('TOTAL_KILLED', 'NUMBER_OF_PERSONS_KILLED'))
+        if total in names
+    }
+    return [col for col in PROJECTION if col in names and col not in derived]
+
+# Rows per scanned batch while loading; bounds the transient memory per step
+LOAD_BATCH_SIZE = 500_000
+
+def downcast_counts(series):
+    """
+    Coerce a count column to numbers and shrink it to the narrowest unsigned
+    integer type. Columns with missing values fall back to float32.
+    """
+    values = pd.to_numeric(series, errors='coerce', downcast='unsigned')
+    if values.dtype.kind == 'f':
+        values = values.astype('float32')
+    return values
+
+def clean_string_column(arr):
+    """
+    Normalize a string column with pyarrow kernels: surrounding whitespace
+    is trimmed, and nulls and literal 'nan' values become empty strings.
+    Non-string columns are returned unchanged.
+    """
+    if pa.types.is_dictionary(arr.type):
+        arr = arr.cast(arr.type.value_type)
+    if not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        return arr
+    arr = pc.fill_null(pc.utf8_trim_whitespace(arr), '')
+    return pc.if_else(pc.equal(arr, 'nan'), pa.scalar('', arr.type), arr)
+
+def open_dataset():
+    """
+    Open the crash data as a pyarrow dataset: the Hive-partitioned
+    directory (BOROUGH=.../part-0.parquet) if it exists, else the single file.
+    Filters on BOROUGH then prune whole partition files.
+    """
+    if os.path.isdir(DATASET_DIR):
+        return ds.dataset(DATASET_DIR, format='parquet', partitioning='hive')
+    return ds.dataset(DATA_PATH, format='parquet')
+
+def map_cell_index(lat, lon):
+    """
+    Row-major MAP_GRID_SIZE x MAP_GRID_SIZE cell index of each coordinate
+    within NYC_BOUNDS, as int32. Missing, zero and out-of-bounds
+    coordinates get -1.
+    """
+    lat_min, lat_max, lon_min, lon_max = NYC_BOUNDS
+    lat = lat.to_numpy(dtype='float32', na_value=np.nan)
+    lon = lon.to_numpy(dtype='float32', na_value=np.nan)
+    inside = (lat >= lat_min) & (lat < lat_max) & (lon >= lon_min) & (lon < lon_max)
+    rows = ((lat[inside] - lat_min) * (MAP_GRID_SIZE / (lat_max - lat_min))).astype(np.int32)
+    cols = ((lon[inside] - lon_min) * (MAP_GRID_SIZE / (lon_max - lon_min))).astype(np.int32)
+    cells = np.full(len(lat), -1, dtype=np.int32)
+    cells[inside] = rows * MAP_GRID_SIZE + cols
+    return cells
+
+def month_categorical(series):
+    """
+    Convert CRASH_MONTH (numbers 1-12 or month names) to an ordered
+    categorical over MONTH_ORDER. Anything else becomes missing.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        months = series.to_numpy(dtype='float64', na_value=np.nan)
+        codes = np.where((months >= 1) & (months <= 12), months - 1, -1).astype('int8')
+        return pd.Categorical.from_codes(codes, categories=MONTH_ORDER, ordered=True)
+    return pd.Categorical(series, categories=MONTH_ORDER, ordered=True)
+
 def load_data():
     """
     Load and preprocess the crash data from Parquet file.
+    Only the projected columns are read, and string columns are decoded
+    straight from Arrow dictionaries into pandas categoricals.
     Handles missing files gracefully with empty dataframe structure.
     """
-    DATA_PATH = os.path.join('data', 'df_merged_clean.parquet')
     try:
-        # Read parquet file
-        df = pd.read_parquet(DATA_PATH)
-        print(f"Data loaded successfully: {len(df):,} records")
+        # Read only the projected columns from the parquet data
+        dataset = open_dataset()
+        columns = projected_columns(dataset.schema.names)
+        
+        # Scan in batches and shrink each one before keeping it: string
+        # columns are cleaned and dictionary-encoded, and counts stored as
+        # text are parsed, so full plain-string columns never pile up
+        batches = []
+        for batch in dataset.to_batches(columns=columns, batch_size=LOAD_BATCH_SIZE, use_threads=True):
+            arrays = []
+            for name, arr in zip(batch.schema.names, batch.columns):
+                if name in CATEGORY_COLS:
+                    arr = clean_string_column(arr).dictionary_encode()
+                elif name in COUNT_COLS:
+                    arr = parse_number_column(arr)
+                arrays.append(arr)
+            batches.append(pa.RecordBatch.from_arrays(arrays, names=batch.schema.names))
+        if batches:
+            table = pa.Table.from_batches(batches)
+        else:
+            table = dataset.to_table(columns=columns, use_threads=True)
+        del batches
+        
+        df = table.to_pandas(
+            categories=[col for col in CATEGORY_COLS if col in columns],
+            split_blocks=True,
+            self_destruct=True,
+            use_threads=True
+        )
+        del table
+        log.info("Data loaded successfully: %d records", len(df))
         
         # Data cleaning and type conversions
-        # Convert CRASH_YEAR to numeric (handle various formats)
+        # Convert CRASH_YEAR to numeric (handle various formats); int16 when complete.
+        # Out-of-range years are dropped once by convert_to_parquet.py
         if 'CRASH_YEAR' in df.columns:
-            df['CRASH_YEAR'] = pd.to_numeric(df['CRASH_YEAR'], errors='coerce')
-            # Remove invalid years
-            df = df[(df['CRASH_YEAR'].isna()) | ((df['CRASH_YEAR'] >= 1900) & (df['CRASH_YEAR'] <= 2100))]
+            df['CRASH_YEAR'] = pd.to_numeric(df['CRASH_YEAR'], errors='coerce', downcast='integer')
         
-        # Ensure numeric columns are properly typed
-        numeric_cols = [
-            'LATITUDE', 'LONGITUDE', 'NUMBER_OF_PERSONS_INJURED',
-            'NUMBER_OF_PERSONS_KILLED', 'CRASH_HOUR', 'CRASH_DAY',
-            'TOTAL_INJURED', 'TOTAL_KILLED'
-        ]
-        for col in numeric_cols:
+        # Ensure numeric columns are properly typed, in the narrowest dtype
+        for col in COORD_COLS:
             if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+        for col in COUNT_COLS:
+            if col in df.columns:
+                df[col] = downcast_counts(df[col])
+        # Map grid cell per crash, so map callbacks only count cell indices
+        if 'LATITUDE' in df.columns and 'LONGITUDE' in df.columns:
+            df['MAP_CELL'] = map_cell_index(df['LATITUDE'], df['LONGITUDE'])
+        # Month as ordered month names (one int8 code per row), weekday as codes
+        if 'CRASH_MONTH' in df.columns:
+            df['CRASH_MONTH'] = month_categorical(df['CRASH_MONTH'])
+        if 'CRASH_WEEKDAY' in df.columns:
+            weekdays = df['CRASH_WEEKDAY'].astype('category')
+            # Sorted categories, as dictionary-encoded files keep first-seen order
+            df['CRASH_WEEKDAY'] = weekdays.cat.reorder_categories(sorted(weekdays.cat.categories))
+        
+        # Injury-type flags: one bool byte per row instead of two count
+        # comparisons per filter (older files do not store them yet)
+        missing_flags = [
+            (flag, injured, killed) for flag, injured, killed in INJURY_FLAGS.values()
+            if flag not in df.columns and injured in df.columns and killed in df.columns
+        ]
+        if missing_flags:
+            # One fused pass: (rows, types, injured/killed) > 0, any over the last axis
+            count_cols = [col for _, injured, killed in missing_flags for col in (injured, killed)]
+            counts = df[count_cols].to_numpy()
+            involved = (counts > 0).reshape(len(df), len(missing_flags), 2).any(axis=2)
+            del counts
+            # The per-type counts are only read to derive the flags; drop them so
+            # the resident frame matches files that store the flags
+            df = df.drop(columns=count_cols)
+            for i, (flag, _, _) in enumerate(missing_flags):
+                df[flag] = np.ascontiguousarray(involved[:, i])
         
-        # Clean string columns to handle encoding issues
-        string_cols = ['VEHICLE_TYPE_CODE_1', 'VEHICLE_TYPE_CODE_2', 
-                      'CONTRIBUTING_FACTOR_VEHICLE_1', 'CONTRIBUTING_FACTOR_VEHICLE_2',
-                      'BOROUGH']
-        for col in string_cols:
+        # Low-cardinality strings as categoricals, so equality filters compare
+        # small integer codes instead of Python strings
+        for col in CATEGORY_COLS:
             if col in df.columns:
-                df[col] = df[col].astype(str).apply(
-                    lambda x: x.encode('utf-8', errors='ignore').decode('utf-8') 
-                    if pd.notna(x) and x != 'nan' else ''
-                )
-                # Replace 'nan' strings with empty
-                df[col] = df[col].replace('nan', '')
+                df[col] = df[col].astype('category')
+        for first, second in CATEGORY_PAIRS:
+            if first in df.columns and second in df.columns:
+                categories = df[first].cat.categories.union(df[second].cat.categories)
+                df[first] = df[first].cat.set_categories(categories)
+                df[second] = df[second].cat.set_categories(categories)
         
         return df
     except FileNotFoundError:
-        print("WARNING: Data file not found. Application will run with empty dataset.")
+        log.warning("Data file not found. Application will run with empty dataset.")
         # Return empty dataframe with expected structure
-        return pd.DataFrame({
-            'CRASH_DATE': [], 'CRASH_TIME': [], 'BOROUGH': [], 'ZIP_CODE': [],
-            'LATITUDE': [], 'LONGITUDE': [], 'ON_STREET_NAME': [], 
-            'CROSS_STREET_NAME': [], 'OFF_STREET_NAME': [],
-            'NUMBER_OF_PERSONS_INJURED': [], 'NUMBER_OF_PERSONS_KILLED': [],
-            'NUMBER_OF_PEDESTRIANS_INJURED': [], 'NUMBER_OF_PEDESTRIANS_KILLED': [],
-            'NUMBER_OF_CYCLIST_INJURED': [], 'NUMBER_OF_CYCLIST_KILLED': [],
-            'NUMBER_OF_MOTORIST_INJURED': [], 'NUMBER_OF_MOTORIST_KILLED': [],
-            'CONTRIBUTING_FACTOR_VEHICLE_1': [], 'CONTRIBUTING_FACTOR_VEHICLE_2': [],
-            'COLLISION_ID': [], 'VEHICLE_TYPE_CODE_1': [], 'VEHICLE_TYPE_CODE_2': [],
-            'CRASH_DATETIME': [], 'CRASH_HOUR': [], 'CRASH_DAY': [],
-            'CRASH_WEEKDAY': [], 'CRASH_MONTH': [], 'CRASH_YEAR': [],
-            'IS_WEEKEND': [], 'TOTAL_PERSONS': [], 'TOTAL_INJURED': [],
-            'TOTAL_KILLED': [], 'AVG_PERSON_AGE': [], 'FEMALE_PERSONS': [],
-            'MALE_PERSONS': [], 'UNKNOWN_SEX': []
-        })
-    except Exception as e:
-        print(f"ERROR: Error loading data: {str(e)}")
+        return pd.DataFrame({col: [] for col in PROJECTION})
+    except Exception:
+        log.exception("Error loading data")
         return pd.DataFrame()
 
 # Load initial dataset
 df = load_data()
 
+# Columns of the loaded dataset, fixed after startup: every frame the
+# report helpers see is a row subset of df, so column availability is
+# checked against this set instead of each frame's Index
+COLSET = frozenset(df.columns)
+HAS_TOTALS = {'TOTAL_INJURED', 'TOTAL_KILLED'} <= COLSET
+HAS_MAP_CELL = 'MAP_CELL' in COLSET
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def parse_search_query(query):
+# Search keyword lookups: matched phrase (lowercase) -> filter value. The
+# search box is parsed in the browser (see the clientside callback below)
+BOROUGH_KEYWORDS = {
+    'brooklyn': 'BROOKLYN', 'manhattan': 'MANHATTAN', 
+    'queens': 'QUEENS', 'bronx': 'BRONX', 
+    'staten island': 'STATEN ISLAND'
+}
+
+# Note: Vehicle types in data are full names like "Sedan", "Station Wagon/Sport Utility Vehicle"
+VEHICLE_KEYWORDS = {
+    'sedan': 'Sedan', 
+    'suv': 'Station Wagon/Sport Utility Vehicle', 'sport utility': 'Station Wagon/Sport Utility Vehicle',
+    'truck': 'Truck', 'pickup': 'Pick-up Truck',
+    'motorcycle': 'Motorcycle', 'moped': 'Moped',
+    'bicycle': 'Bicycle', 'bike': 'Bicycle',
+    'bus': 'Bus',
+    'van': 'Van',
+    'taxi': 'Taxi',
+    'ambulance': 'Ambulance'
+}
+
+FACTOR_KEYWORDS = {
+    'speeding': 'Unsafe Speed', 'speed': 'Unsafe Speed',
+    'alcohol': 'Alcohol Involvement', 'drunk': 'Alcohol Involvement',
+    'distraction': 'Driver Inattention/Distraction',
+    'inattention': 'Driver Inattention/Distraction',
+    'red light': 'Traffic Control Disregarded',
+    'stop sign': 'Traffic Control Disregarded'
+}
+
+def column_equals(series, value, out=None):
+    """
+    Boolean array of series == value, written into out when given.
+    Categorical columns compare their integer codes against the code of
+    value, which is looked up once; a value that is not a category
+    short-circuits to an all-False mask.
     """
-    Parse natural language search query and extract filter parameters.
+    if out is None:
+        out = np.empty(len(series), dtype=bool)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        code = series.cat.categories.get_indexer([value])[0]
+        if code < 0:
+            out.fill(False)
+            return out
+        return np.equal(series.cat.codes.to_numpy(), code, out=out)
+    return np.equal(series.to_numpy(), value, out=out)
+
+def either_column_equals(first, second, value, out, scratch):
+    """out = (first == value) | (second == value), using scratch as the temporary."""
+    column_equals(first, value, out=out)
+    return np.logical_or(out, column_equals(second, value, out=scratch), out=out)
+
+# Columns the vehicle and factor filters compare against
+FILTER_COLUMN_PAIRS = {
+    'vehicle_type': ['VEHICLE_TYPE_CODE_1', 'VEHICLE_TYPE_CODE_2'],
+    'contributing_factor': ['CONTRIBUTING_FACTOR_VEHICLE_1', 'CONTRIBUTING_FACTOR_VEHICLE_2']
+}
+
+def build_filter_mask(df, filters):
+    """
+    Build one boolean mask combining all active filters.
     
-    Examples:
-        "Brooklyn 2022 pedestrian crashes" -> borough=Brooklyn, year=2022, injury_type=Pedestrian
-        "Queens speeding accidents" -> borough=Queens, contributing_factor=Unsafe Speed
+    Args:
+        df: Input dataframe
+        filters: Dict with filter values (borough, year, vehicle_type, etc.)
     
     Returns:
-        dict: Filter parameters with keys: borough, year, vehicle_type, 
-              contributing_factor, injury_type
+        numpy boolean array, or None when no filter is active
     """
-    if not query:
-        return {
-            'borough': None, 'year': None, 'vehicle_type': None,
-            'contributing_factor': None, 'injury_type': None
-        }
-    
-    filters = {
-        'borough': None, 'year': None, 'vehicle_type': None,
-        'contributing_factor': None, 'injury_type': None
-    }
-    
-    query_lower = query.lower()
+    # Every active filter is ANDed in place into one preallocated mask, with
+    # two scratch buffers reused for the per-column comparisons
+    n = len(df)
+    mask = np.ones(n, dtype=bool)
+    cond = np.empty(n, dtype=bool)
+    scratch = np.empty(n, dtype=bool)
+    active = False
     
-    # Extract borough
-    boroughs = {
-        'brooklyn': 'BROOKLYN', 'manhattan': 'MANHATTAN', 
-        'queens': 'QUEENS', 'bronx': 'BRONX', 
-        'staten island': 'STATEN ISLAND'
-    }
-    for key, value in boroughs.items():
-        if key in query_lower:
-            filters['borough'] = value
-            break
+    # Borough filter
+    if filters.get('borough') and filters['borough'] != 'All':
+        mask &= column_equals(df['BOROUGH'], filters['borough'], out=cond)
+        active = True
     
-    # Extract year (4-digit years)
-    year_match = re.search(r'\b(19|20)\d{2}\b', query)
-    if year_match:
-        full_year_match = re.search(r'\b(19\d{2}|20\d{2})\b', query)
-        if full_year_match:
-            try:
-                filters['year'] = int(full_year_match.group())
-            except ValueError:
-                pass
+    # Year filter
+    if filters.get('year') and filters['year'] != 'All':
+        if isinstance(filters['year'], (int, float)):
+            mask &= np.equal(df['CRASH_YEAR'].values, filters['year'], out=cond)
+            active = True
     
-    # Extract vehicle type keywords - match actual data values
-    # Note: Vehicle types in data are full names like "Sedan", "Station Wagon/Sport Utility Vehicle"
-    vehicle_keywords = {
-        'sedan': 'Sedan', 
-        'suv': 'Station Wagon/Sport Utility Vehicle', 'sport utility': 'Station Wagon/Sport Utility Vehicle',
-        'truck': 'Truck', 'pickup': 'Pick-up Truck',
-        'motorcycle': 'Motorcycle', 'moped': 'Moped',
-        'bicycle': 'Bicycle', 'bike': 'Bicycle',
-        'bus': 'Bus',
-        'van': 'Van',
-        'taxi': 'Taxi',
-        'ambulance': 'Ambulance'
-    }
-    for key, value in vehicle_keywords.items():
-        if key in query_lower:
-            filters['vehicle_type'] = value
-            break
+    # Vehicle type and contributing factor filters (either column of the pair)
+    for name, (first, second) in FILTER_COLUMN_PAIRS.items():
+        if filters.get(name) and filters[name] != 'All':
+            mask &= either_column_equals(df[first], df[second], filters[name], cond, scratch)
+            active = True
     
-    # Extract injury type
-    if 'pedestrian' in query_lower:
-        filters['injury_type'] = 'Pedestrian'
-    elif 'cyclist' in query_lower or 'bicycle' in query_lower:
-        filters['injury_type'] = 'Cyclist'
-    elif 'motorist' in query_lower or 'driver' in query_lower:
-        filters['injury_type'] = 'Motorist'
+    # Injury type filter (one precomputed bool column per injury type)
+    if filters.get('injury_type') and filters['injury_type'] != 'All':
+        if filters['injury_type'] in INJURY_FLAGS:
+            flag = INJURY_FLAGS[filters['injury_type']][0]
+            mask &= df[flag].to_numpy()
+            active = True
     
-    # Extract contributing factors
-    factor_keywords = {
-        'speeding': 'Unsafe Speed', 'speed': 'Unsafe Speed',
-        'alcohol': 'Alcohol Involvement', 'drunk': 'Alcohol Involvement',
-        'distraction': 'Driver Inattention/Distraction',
-        'inattention': 'Driver Inattention/Distraction',
-        'red light': 'Traffic Control Disregarded',
-        'stop sign': 'Traffic Control Disregarded'
-    }
-    for key, value in factor_keywords.items():
-        if key in query_lower:
-            filters['contributing_factor'] = value
-            break
+    if not active:
+        return None
     
-    return filters
+    return mask
+
+FILTER_KEYS = ('borough', 'year', 'vehicle_type', 'contributing_factor', 'injury_type')
 
-def get_dropdown_options(df):
+def is_active(value):
+    """True when a filter value actually restricts the data."""
+    return bool(value) and value != 'All'
+
+def build_borough_year_index(df):
     """
-    Extract unique values from dataframe for dropdown filter options.
-    Handles missing columns gracefully.
+    Precompute row positions for every (BOROUGH, CRASH_YEAR) pair so the
+    most common filters become dict lookups instead of full-column scans.
     
     Returns:
-        dict: Options for each filter type
+        dict: (borough, year) -> read-only int32 array of row positions
     """
-    options = {
-        'boroughs': [], 'years': [], 'vehicle_types': [],
-        'contributing_factors': [], 'injury_types': ['All', 'Pedestrian', 'Cyclist', 'Motorist']
-    }
-    
-    if df.empty:
-        return options
+    if df.empty or not {'BOROUGH', 'CRASH_YEAR'} <= COLSET:
+        return {}
     
-    # Boroughs
-    if 'BOROUGH' in df.columns:
-        boroughs = [b for b in df['BOROUGH'].dropna().unique() if b and str(b).strip()]
-        options['boroughs'] = sorted(boroughs)
+    index = {}
+    groups = df.groupby(['BOROUGH', 'CRASH_YEAR'], observed=True, dropna=False).indices
+    for key, positions in groups.items():
+        positions = positions.astype(np.int32)
+        positions.flags.writeable = False
+        index[key] = positions
+    return index
+
+BOROUGH_YEAR_INDEX = build_borough_year_index(df)
+
+def lookup_borough_year(borough, year):
+    """
+    Row positions for a borough and/or year filter from BOROUGH_YEAR_INDEX.
+    Pass None for a filter that is not active.
+    """
+    keys = [
+        key for key in BOROUGH_YEAR_INDEX
+        if (borough is None or key[0] == borough) and (year is None or key[1] == year)
+    ]
+    if not keys:
+        return np.empty(0, dtype=np.int32)
+    if len(keys) == 1:
+        return BOROUGH_YEAR_INDEX[keys[0]]
     
-    # Years - handle various data types
-    if 'CRASH_YEAR' in df.columns:
-        years_list = []
-        for y in df['CRASH_YEAR'].dropna().unique():
-            try:
-                # Convert to numeric first
-                year_val = pd.to_numeric(y, errors='coerce')
-                if pd.notna(year_val) and year_val >= 1900 and year_val <= 2100:
-                    years_list.append(int(year_val))
-            except:
-                continue
-        options['years'] = sorted(list(set(years_list)))  # Remove duplicates and sort
+    positions = np.sort(np.concatenate([BOROUGH_YEAR_INDEX[key] for key in keys]))
+    positions.flags.writeable = False
+    return positions
+
+def borough_year_selection(borough, year, vehicle_type, contributing_factor, injury_type):
+    """
+    The (borough, year) pair to look up when only borough/year filters are
+    active, with None for an inactive one. Returns None when any other
+    filter is active.
+    """
+    if is_active(vehicle_type) or is_active(contributing_factor) or is_active(injury_type):
+        return None
+    return (
+        borough if is_active(borough) else None,
+        year if is_active(year) and isinstance(year, (int, float)) else None
+    )
+
+def refine_positions(positions, filters):
+    """
+    Narrow row positions already matching the borough/year filters by the
+    remaining filters, evaluating them only on those rows (the borough/year
+    predicates are pushed down to BOROUGH_YEAR_INDEX).
+    """
+    columns = [
+        col for name, cols in FILTER_COLUMN_PAIRS.items() if is_active(filters.get(name))
+        for col in cols
+    ]
+    if filters.get('injury_type') in INJURY_FLAGS:
+        columns.append(INJURY_FLAGS[filters['injury_type']][0])
+    subset = df.iloc[positions, df.columns.get_indexer(columns)]
+    mask = build_filter_mask(subset, {**filters, 'borough': 'All', 'year': 'All'})
+    if mask is None:
+        return positions
+    positions = positions[mask]
+    positions.flags.writeable = False
+    return positions
+
+@functools.lru_cache(maxsize=32)
+def _filtered_positions(borough, year, vehicle_type, contributing_factor, injury_type):
+    """
+    Row positions in the loaded dataset matching one filter combination.
+    Memoized so repeated or toggled-back selections skip the mask build.
+    Returns None when no filter is active.
+    """
+    # Borough/year-only selections are served straight from the prebuilt index
+    selection = borough_year_selection(borough, year, vehicle_type, contributing_factor, injury_type)
+    if BOROUGH_YEAR_INDEX and selection is not None and selection != (None, None):
+        return lookup_borough_year(*selection)
     
-    # Vehicle types - filter to show only valid, common vehicle types
-    if 'VEHICLE_TYPE_CODE_1' in df.columns:
-        # Get value counts to prioritize common vehicle types
-        all_vehicles = pd.concat([df['VEHICLE_TYPE_CODE_1'], df['VEHICLE_TYPE_CODE_2']]).dropna()
-        vehicle_counts = all_vehicles.value_counts()
-        
-        # Filter for valid vehicle types: at least 3 chars, contains letters, not mostly numbers/symbols
-        valid_vehicle_types = []
-        invalid_patterns = ['', 'nan', 'None', 'Unknown', '-', '.', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9']
-        
-        for v_type, count in vehicle_counts.items():
-            if pd.notna(v_type):
-                v_str = str(v_type).strip()
-                # Must be: non-empty, at least 4 chars, contains letters, not mostly symbols/numbers
-                if (v_str and 
-                    v_str not in invalid_patterns and
-                    len(v_str) >= 4 and  # At least 4 characters
-                    not v_str.isdigit() and  # Not just numbers
-                    not v_str.startswith("'") and  # Not weird quoted strings
-                    not v_str.startswith("(") and  # Not starting with parenthesis (likely corrupted)
-                    not v_str[0].isdigit() and  # Doesn't start with digit
-                    sum(c.isalpha() for c in v_str) >= 2):  # At least 2 letters
-                    valid_vehicle_types.append(v_str)
-        
-        # Remove case-insensitive duplicates (keep the most common version)
-        seen_lower = {}
-        deduplicated = []
-        for v_type in valid_vehicle_types:
-            v_lower = v_type.lower()
-            if v_lower not in seen_lower:
-                seen_lower[v_lower] = v_type
-                deduplicated.append(v_type)
-            else:
-                # Keep the one with higher count
-                existing = seen_lower[v_lower]
-                if vehicle_counts.get(v_type, 0) > vehicle_counts.get(existing, 0):
-                    deduplicated.remove(existing)
-                    deduplicated.append(v_type)
-                    seen_lower[v_lower] = v_type
-        
-        # Sort by frequency (most common first), then alphabetically
-        # Limit to top 50 most common valid types
-        sorted_types = sorted(deduplicated, 
-                            key=lambda x: (vehicle_counts.get(x, 0), x), 
-                            reverse=True)[:50]
-        options['vehicle_types'] = sorted(sorted_types)  # Final alphabetical sort
+    filters = dict(zip(FILTER_KEYS, (borough, year, vehicle_type, contributing_factor, injury_type)))
+    # With both borough and year set, the other filters only need to scan
+    # that one indexed (borough, year) slice, a few percent of the rows
+    if BOROUGH_YEAR_INDEX and is_active(borough) and is_active(year) and isinstance(year, (int, float)):
+        return refine_positions(lookup_borough_year(borough, year), filters)
     
-    # Contributing factors - filter out invalid entries and ensure proper encoding
-    if 'CONTRIBUTING_FACTOR_VEHICLE_1' in df.columns:
-        f1 = df['CONTRIBUTING_FACTOR_VEHICLE_1'].dropna().unique()
-        f2 = df['CONTRIBUTING_FACTOR_VEHICLE_2'].dropna().unique() if 'CONTRIBUTING_FACTOR_VEHICLE_2' in df.columns else []
-        factors = []
-        invalid_patterns = ['', 'nan', 'None', 'Unspecified', 'Unknown', '-', '.', '0', '1', '2']
-        for f in pd.concat([pd.Series(f1), pd.Series(f2)]).unique():
-            if pd.notna(f):
-                f_str = str(f).strip()
-                # Filter out: empty, numbers only, single characters, and invalid patterns
-                if (f_str and 
-                    f_str not in invalid_patterns and
-                    len(f_str) > 3 and  # Must be at least 4 characters (reasonable text)
-                    not f_str.isdigit() and  # Not just numbers
-                    any(c.isalpha() for c in f_str)):  # Must contain at least one letter
-                    # Ensure proper encoding
-                    try:
-                        f_encoded = f_str.encode('utf-8', errors='ignore').decode('utf-8')
-                        if f_encoded:
-                            factors.append(f_encoded)
-                    except:
-                        pass
-        # Remove duplicates and sort
-        options['contributing_factors'] = sorted(list(set(factors)))
+    mask = build_filter_mask(df, filters)
+    if mask is None:
+        return None
     
-    return options
+    # int32 positions keep cached entries small; freeze them since they are shared
+    positions = np.flatnonzero(mask).astype(np.int32)
+    positions.flags.writeable = False
+    return positions
 
-def apply_filters(df, filters):
+def filter_key(filters):
     """
-    Apply all filters to the dataframe.
+    Normalize filter values into the tuple used as the row-position cache key.
+    """
+    # Cache keys must be hashable primitives (Dash may hand back numpy scalars)
+    return tuple(
+        int(filters.get(k)) if isinstance(filters.get(k), np.integer) else filters.get(k)
+        for k in FILTER_KEYS
+    )
+
+def get_filtered_data(filters, columns=None):
+    """
+    Filter the loaded dataset, reusing cached row positions for filter
+    combinations that were already computed.
     
     Args:
-        df: Input dataframe
         filters: Dict with filter values (borough, year, vehicle_type, etc.)
+        columns: Optional list of columns to keep; only these are gathered
+            for the matching rows
     
     Returns:
         Filtered dataframe
     """
-    filtered_df = df.copy()
+    positions = _filtered_positions(*filter_key(filters))
+    if positions is None:
+        return df
+    if columns is None:
+        return df.iloc[positions]
+    return df.iloc[positions, df.columns.get_indexer(columns)]
+
+def shares_categories(first, second):
+    """True when both series are categoricals over the same categories (same codes)."""
+    return (isinstance(first.dtype, pd.CategoricalDtype) and isinstance(second.dtype, pd.CategoricalDtype) and
+            first.cat.categories.equals(second.cat.categories))
+
+def is_code_column(series):
+    """True for categorical columns, whose integer codes can be binned directly."""
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+def hour_weekday_histogram(hours, weekdays):
+    """
+    Crash counts per (hour, weekday) from one bincount over the flattened
+    weekday-code x hour cell index, instead of a hash groupby.
     
-    # Borough filter
-    if filters.get('borough') and filters['borough'] != 'All':
-        filtered_df = filtered_df[filtered_df['BOROUGH'] == filters['borough']]
+    Returns:
+        Series indexed by (CRASH_HOUR, CRASH_WEEKDAY), occupied cells only
+    """
+    hours = hours.to_numpy()
+    codes = weekdays.cat.codes.to_numpy()
+    n_hours = int(hours.max()) + 1 if len(hours) else 0
+    known = codes >= 0
+    grid = np.bincount(
+        codes[known].astype(np.int64) * n_hours + hours[known],
+        minlength=len(weekdays.cat.categories) * n_hours
+    )
+    occupied = np.flatnonzero(grid)
+    weekday, hour = np.divmod(occupied, n_hours)
+    index = pd.MultiIndex.from_arrays(
+        [hour, weekdays.cat.categories.take(weekday)], names=['CRASH_HOUR', 'CRASH_WEEKDAY']
+    )
+    return pd.Series(grid[occupied], index=index)
+
+# Filter columns the aggregate cube is keyed by
+CUBE_KEYS = ['BOROUGH', 'CRASH_YEAR']
+
+# Columns summed into the totals table: casualty totals (falling back to
+# the per-person counts) and the injury-type flags
+TOTAL_SUM_COLS = (
+    [col for col in ('TOTAL_INJURED', 'TOTAL_KILLED') if col in COLSET] +
+    [col for total, col in (('TOTAL_INJURED', 'NUMBER_OF_PERSONS_INJURED'),
+                            ('TOTAL_KILLED', 'NUMBER_OF_PERSONS_KILLED'))
+     if total not in COLSET and col in COLSET] +
+    [flag for flag, _, _ in INJURY_FLAGS.values() if flag in COLSET]
+)
+
+# Columns build_aggregates reads; filtered reports gather only these
+AGGREGATE_COLS = [
+    col for col in CUBE_KEYS + TOTAL_SUM_COLS + [
+        'CRASH_HOUR', 'CRASH_WEEKDAY', 'CRASH_MONTH',
+        'CONTRIBUTING_FACTOR_VEHICLE_1', 'CONTRIBUTING_FACTOR_VEHICLE_2'
+    ]
+    if col in COLSET
+]
+
+def borough_year_totals(frame, sum_cols):
+    """
+    Crash counts and column sums per (BOROUGH, CRASH_YEAR), the same table
+    as a groupby sum, computed with weighted bincounts over borough codes
+    and year offsets (direct indexing instead of hashing the keys).
+    Needs a categorical BOROUGH and an integer CRASH_YEAR.
+    """
+    categories = frame['BOROUGH'].cat.categories
+    codes = frame['BOROUGH'].cat.codes.to_numpy().astype(np.int64)
+    codes[codes < 0] = len(categories)  # missing boroughs get their own slot
+    years = frame['CRASH_YEAR'].to_numpy()
+    year0 = int(years.min())
+    n_years = int(years.max()) - year0 + 1
+    cells = codes * n_years + (years - year0)
+    size = (len(categories) + 1) * n_years
     
-    # Year filter
-    if filters.get('year') and filters['year'] != 'All':
-        if isinstance(filters['year'], (int, float)):
-            filtered_df = filtered_df[filtered_df['CRASH_YEAR'] == filters['year']]
+    crashes = np.bincount(cells, minlength=size)
+    occupied = np.flatnonzero(crashes)
+    borough, year = np.divmod(occupied, n_years)
+    index = pd.MultiIndex.from_arrays([
+        pd.Categorical.from_codes(np.where(borough < len(categories), borough, -1), categories=categories),
+        (year + year0).astype(years.dtype)
+    ], names=CUBE_KEYS)
+    totals = pd.DataFrame({'crashes': crashes[occupied]}, index=index)
+    for col in sum_cols:
+        values = frame[col].to_numpy()
+        if values.dtype.kind == 'f':
+            # groupby sums skip missing values
+            values = np.nan_to_num(values)
+        sums = np.bincount(cells, weights=values, minlength=size)[occupied]
+        totals[col] = sums.round().astype(np.int64) if values.dtype.kind in 'iub' else sums
+    return totals
+
+def build_aggregates(frame, keys=()):
+    """
+    Compute the small aggregate tables behind the summary cards and every
+    chart except the map. With keys (e.g. CUBE_KEYS) the tables are also
+    grouped by those columns, so one cube built at startup can answer any
+    borough/year selection through summarize_aggregates.
     
-    # Vehicle type filter
-    if filters.get('vehicle_type') and filters['vehicle_type'] != 'All':
-        filtered_df = filtered_df[
-            (filtered_df['VEHICLE_TYPE_CODE_1'] == filters['vehicle_type']) |
-            (filtered_df['VEHICLE_TYPE_CODE_2'] == filters['vehicle_type'])
-        ]
+    Returns:
+        dict: aggregate name -> Series/DataFrame (columns missing from
+        COLSET are skipped)
+    """
+    keys = [key for key in keys if key in COLSET]
+    aggregates = {}
     
-    # Contributing factor filter
-    if filters.get('contributing_factor') and filters['contributing_factor'] != 'All':
-        filtered_df = filtered_df[
-            (filtered_df['CONTRIBUTING_FACTOR_VEHICLE_1'] == filters['contributing_factor']) |
-            (filtered_df['CONTRIBUTING_FACTOR_VEHICLE_2'] == filters['contributing_factor'])
-        ]
+    # Crash counts, casualty totals and injury-type counts per borough and
+    # year: the cards, borough and year charts and the pie all sum this table
+    sum_cols = TOTAL_SUM_COLS
+    by = [col for col in CUBE_KEYS if col in COLSET]
+    if (len(by) == 2 and len(frame) and is_code_column(frame['BOROUGH']) and
+            frame['CRASH_YEAR'].dtype.kind in 'iu'):
+        totals = borough_year_totals(frame, sum_cols)
+    elif by:
+        grouped = frame.groupby(by, observed=True, dropna=False)
+        totals = grouped[sum_cols].sum()
+        totals.insert(0, 'crashes', grouped.size())
+    else:
+        totals = frame[sum_cols].sum().to_frame().T
+        totals.insert(0, 'crashes', len(frame))
+    # Sums can come back in the narrow count dtypes; widen them so chart
+    # arithmetic (e.g. killed x 100) cannot overflow
+    aggregates['totals'] = totals.astype({
+        col: 'int64' for col, dtype in totals.dtypes.items() if dtype.kind in 'iub'
+    })
     
-    # Injury type filter
-    if filters.get('injury_type') and filters['injury_type'] != 'All':
-        if filters['injury_type'] == 'Pedestrian':
-            filtered_df = filtered_df[
-                (filtered_df['NUMBER_OF_PEDESTRIANS_INJURED'] > 0) |
-                (filtered_df['NUMBER_OF_PEDESTRIANS_KILLED'] > 0)
-            ]
-        elif filters['injury_type'] == 'Cyclist':
-            filtered_df = filtered_df[
-                (filtered_df['NUMBER_OF_CYCLIST_INJURED'] > 0) |
-                (filtered_df['NUMBER_OF_CYCLIST_KILLED'] > 0)
-            ]
-        elif filters['injury_type'] == 'Motorist':
-            filtered_df = filtered_df[
-                (filtered_df['NUMBER_OF_MOTORIST_INJURED'] > 0) |
-                (filtered_df['NUMBER_OF_MOTORIST_KILLED'] > 0)
-            ]
+    def counts(dims):
+        return frame.groupby(keys + dims, observed=True, dropna=False).size()
+    
+    if {'CRASH_HOUR', 'CRASH_WEEKDAY'} <= COLSET:
+        if not keys and is_code_column(frame['CRASH_WEEKDAY']) and frame['CRASH_HOUR'].dtype.kind in 'iu':
+            aggregates['hour_weekday'] = hour_weekday_histogram(frame['CRASH_HOUR'], frame['CRASH_WEEKDAY'])
+        else:
+            aggregates['hour_weekday'] = counts(['CRASH_HOUR', 'CRASH_WEEKDAY'])
+    if 'CRASH_MONTH' in COLSET:
+        aggregates['month'] = counts(['CRASH_MONTH'])
+    factor_cols = [
+        col for col in ('CONTRIBUTING_FACTOR_VEHICLE_1', 'CONTRIBUTING_FACTOR_VEHICLE_2')
+        if col in COLSET
+    ]
+    if not keys and len(factor_cols) == 2 and shares_categories(frame[factor_cols[0]], frame[factor_cols[1]]):
+        # Shared categories: histogram both columns' integer codes in one bincount
+        categories = frame[factor_cols[0]].cat.categories
+        codes = np.concatenate([frame[col].cat.codes.to_numpy() for col in factor_cols])
+        aggregates['factors'] = pd.Series(
+            np.bincount(codes[codes >= 0], minlength=len(categories)),
+            index=pd.Index(categories, name='FACTOR')
+        )
+    elif 'CONTRIBUTING_FACTOR_VEHICLE_1' in COLSET:
+        # Both factor columns counted under one FACTOR level
+        factor_counts = [counts([col]).rename_axis(keys + ['FACTOR']) for col in factor_cols]
+        aggregates['factors'] = functools.reduce(
+            lambda a, b: a.add(b, fill_value=0), factor_counts
+        ).astype('int64')
+    
+    return aggregates
+
+def select_borough_year(table, borough=None, year=None):
+    """Rows of an aggregate table whose BOROUGH/CRASH_YEAR levels match (None = any)."""
+    mask = np.ones(len(table), dtype=bool)
+    for level, value in (('BOROUGH', borough), ('CRASH_YEAR', year)):
+        if value is not None and level in table.index.names:
+            mask &= np.asarray(table.index.get_level_values(level) == value)
+    return table[mask]
+
+def summarize_aggregates(aggregates, borough=None, year=None):
+    """
+    Collapse build_aggregates output into the per-chart aggregates, keeping
+    only the rows for the selected borough and/or year (None = all).
+    Missing values in a chart dimension are dropped, as groupby does.
+    
+    Returns:
+        dict: 'totals' (Series of sums) plus one Series/DataFrame per chart
+    """
+    totals = select_borough_year(aggregates['totals'], borough, year)
+    summary = {'totals': totals.sum()}
+    if 'BOROUGH' in totals.index.names:
+        summary['borough'] = totals['crashes'].groupby(level='BOROUGH', observed=True).sum()
+    if 'CRASH_YEAR' in totals.index.names:
+        summary['year'] = totals.groupby(level='CRASH_YEAR').sum()
+    
+    for name in ('hour_weekday', 'month', 'factors'):
+        if name in aggregates:
+            table = select_borough_year(aggregates[name], borough, year)
+            dims = [level for level in table.index.names if level not in CUBE_KEYS]
+            summary[name] = table.groupby(level=dims, observed=True).sum()
+    
+    return summary
+
+# Aggregate cube for borough/year selections (the default and most common
+# reports), so those never rescan rows for the cards and charts
+AGGREGATE_CUBE = build_aggregates(df, CUBE_KEYS) if not df.empty else {}
+
+def get_chart_aggregates(filters):
+    """
+    Chart aggregates for a filter combination: sliced from AGGREGATE_CUBE
+    when only borough/year filters are active, otherwise computed from the
+    filtered rows.
+    """
+    selection = borough_year_selection(*filter_key(filters))
+    if AGGREGATE_CUBE and selection is not None:
+        return summarize_aggregates(AGGREGATE_CUBE, *selection)
+    return summarize_aggregates(build_aggregates(get_filtered_data(filters, AGGREGATE_COLS)))
+
+# Columns map_density_grid reads
+MAP_COLS = [col for col in ('MAP_CELL', 'TOTAL_INJURED', 'TOTAL_KILLED') if col in COLSET]
+
+def map_cells_frame(cells, crashes, severity):
+    """Map grid cells as a DataFrame of cell centers with their crash counts and severity."""
+    lat_min, lat_max, lon_min, lon_max = NYC_BOUNDS
+    row, col = np.divmod(np.asarray(cells), MAP_GRID_SIZE)
+    return pd.DataFrame({
+        'LATITUDE': lat_min + (row + 0.5) * ((lat_max - lat_min) / MAP_GRID_SIZE),
+        'LONGITUDE': lon_min + (col + 0.5) * ((lon_max - lon_min) / MAP_GRID_SIZE),
+        'Crashes': np.asarray(crashes),
+        'Severity': np.asarray(severity)
+    })
+
+def map_density_grid(frame):
+    """
+    Bin the crashes of a (filtered) frame into the map grid with one
+    bincount over the precomputed MAP_CELL indices.
+    
+    Returns:
+        DataFrame of occupied cells: LATITUDE, LONGITUDE (cell centers),
+        Crashes and Severity (sum of injured + 10 x killed + 1 per crash)
+    """
+    cells = frame['MAP_CELL'].to_numpy()
+    inside = cells >= 0
+    severity = np.ones(int(inside.sum()))
+    if HAS_TOTALS:
+        severity += frame['TOTAL_INJURED'].to_numpy()[inside]
+        severity += frame['TOTAL_KILLED'].to_numpy()[inside] * 10.0
+    
+    cells = cells[inside]
+    crashes = np.bincount(cells, minlength=MAP_GRID_SIZE * MAP_GRID_SIZE)
+    weights = np.bincount(cells, weights=severity, minlength=MAP_GRID_SIZE * MAP_GRID_SIZE)
+    occupied = np.flatnonzero(crashes)
+    return map_cells_frame(occupied, crashes[occupied], weights[occupied])
+
+def build_map_cube(frame):
+    """
+    Crash count and severity per (BOROUGH, CRASH_YEAR, MAP_CELL), built once
+    so borough/year maps are a slice of a few thousand cells.
+    """
+    if frame.empty or not HAS_MAP_CELL:
+        return None
+    keys = [col for col in CUBE_KEYS if col in COLSET]
+    frame = frame[frame['MAP_CELL'].to_numpy() >= 0]
+    grouped = frame.groupby(keys + ['MAP_CELL'], observed=True, dropna=False)
+    cube = grouped.size().rename('Crashes').to_frame()
+    cube['Severity'] = cube['Crashes'].astype('float64')
+    if HAS_TOTALS:
+        cube['Severity'] += grouped['TOTAL_INJURED'].sum().astype('float64')
+        cube['Severity'] += grouped['TOTAL_KILLED'].sum().astype('float64') * 10
+    return cube
+
+MAP_CUBE = build_map_cube(df)
+
+def get_map_cells(filters):
+    """
+    Map grid cells for a filter combination: sliced from MAP_CUBE when only
+    borough/year filters are active, otherwise binned from the filtered rows.
+    """
+    selection = borough_year_selection(*filter_key(filters))
+    if MAP_CUBE is not None and selection is not None:
+        cells = select_borough_year(MAP_CUBE, *selection).groupby(level='MAP_CELL').sum()
+        return map_cells_frame(cells.index, cells['Crashes'], cells['Severity'])
+    if not HAS_MAP_CELL:
+        return map_cells_frame([], [], [])
+    return map_density_grid(get_filtered_data(filters, MAP_COLS))
+
+@functools.lru_cache(maxsize=32)
+def build_report(key):
+    """
+    Summary cards and charts for one normalized filter key (see filter_key).
+    Memoized, since the output depends only on the filters and users often
+    re-click or go back to earlier selections.
     
-    return filtered_df
+    Returns:
+        (visualizations, summary_stats)
+    """
+    filters = dict(zip(FILTER_KEYS, key))
+    aggregates = get_chart_aggregates(filters)
+    return create_all_visualizations(aggregates), calculate_summary_stats(aggregates)
+
+@functools.lru_cache(maxsize=32)
+def build_map(key):
+    """Map children for one normalized filter key, memoized like build_report."""
+    return create_map_visualization(get_map_cells(dict(zip(FILTER_KEYS, key))))
+
+def load_dropdown_options(df):
+    """
+    Load the dropdown options precomputed by convert_to_parquet.py.
+    Falls back to computing them from the dataframe if the file is missing.
+    """
+    try:
+        with open(DROPDOWN_OPTIONS_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return get_dropdown_options(df)
 
 # Initialize dropdown options
-dropdown_options = get_dropdown_options(df)
+dropdown_options = load_dropdown_options(df)
 
 # ============================================================================
 # DASH APP INITIALIZATION
@@ -589,21 +1058,31 @@ app.layout = html.Div([
         
         # Right Side - Visualizations
         html.Div([
+            # Filter key of the current report; the row positions it maps to
+            # stay cached server-side, so callbacks reuse them without refiltering
+            dcc.Store(id='report-filter-key', storage_type='memory'),
+            
             # Summary Statistics Cards
             html.Div(id='summary-stats', children=[]),
             
             # Visualizations Container
-            html.Div(id='visualizations-container', children=[
-                html.Div([
-                    html.H3("👈 Select filters and click 'Generate Report' to view visualizations",
-                           style={
-                               'textAlign': 'center',
-                               'color': '#95a5a6',
-                               'padding': '100px 20px',
-                               'fontSize': '1.2em'
-                           })
-                ])
-            ])
+            dcc.Loading(
+                html.Div(id='visualizations-container', children=[
+                    html.Div([
+                        html.H3("👈 Select filters and click 'Generate Report' to view visualizations",
+                               style={
+                                   'textAlign': 'center',
+                                   'color': '#95a5a6',
+                                   'padding': '100px 20px',
+                                   'fontSize': '1.2em'
+                               })
+                    ])
+                ]),
+                type='default'
+            ),
+            
+            # Map Container (filled by its own callback once the report's filter key is stored)
+            dcc.Loading(html.Div(id='map-container', children=[]), type='default')
         ], style={
             'width': '75%',
             'display': 'inline-block',
@@ -621,7 +1100,52 @@ app.layout = html.Div([
 # CALLBACKS
 # ============================================================================
 
-@callback(
+# Search parsing runs in the browser, so applying a search costs no server
+# round-trip; the keyword tables are embedded from the Python dicts above
+SEARCH_KEYWORDS_JSON = json.dumps({
+    'borough': BOROUGH_KEYWORDS, 'vehicle': VEHICLE_KEYWORDS, 'factor': FACTOR_KEYWORDS
+})
+
+clientside_callback(
+    r"""
+    function(n_clicks, query) {
+        // Parse a natural language query into the five filter values, e.g.
+        // "Brooklyn 2022 pedestrian crashes" -> BROOKLYN, 2022, All, All, Pedestrian
+        if (!query) {
+            return ['All', 'All', 'All', 'All', 'All'];
+        }
+        var keywords = SEARCH_KEYWORDS_JSON;
+        var lower = query.toLowerCase();
+        
+        // Any keyword at the start of a word, case-insensitive; longer
+        // keywords first so they win over their prefixes
+        function lookup(table) {
+            var alternatives = Object.keys(table)
+                .sort(function(a, b) { return b.length - a.length; })
+                .map(function(k) { return k.replace(/[.*+?^${}()|[\]\\]/g, '\\$&'); });
+            var found = query.match(new RegExp('\\b(?:' + alternatives.join('|') + ')', 'i'));
+            return found ? table[found[0].toLowerCase()] : 'All';
+        }
+        
+        var year = query.match(/\b(?:19|20)\d{2}\b/);
+        var injury = 'All';
+        if (lower.indexOf('pedestrian') >= 0) {
+            injury = 'Pedestrian';
+        } else if (lower.indexOf('cyclist') >= 0 || lower.indexOf('bicycle') >= 0) {
+            injury = 'Cyclist';
+        } else if (lower.indexOf('motorist') >= 0 || lower.indexOf('driver') >= 0) {
+            injury = 'Motorist';
+        }
+        
+        return [
+            lookup(keywords.borough),
+            year ? parseInt(year[0], 10) : 'All',
+            lookup(keywords.vehicle),
+            lookup(keywords.factor),
+            injury
+        ];
+    }
+    """.replace('SEARCH_KEYWORDS_JSON', SEARCH_KEYWORDS_JSON),
     [Output('borough-filter', 'value'),
      Output('year-filter', 'value'),
      Output('vehicle-type-filter', 'value'),
@@ -631,26 +1155,11 @@ app.layout = html.Div([
     State('search-input', 'value'),
     prevent_initial_call=True
 )
-def apply_search(n_clicks, search_query):
-    """
-    Parse search query and update filter dropdowns automatically.
-    """
-    if not search_query:
-        return 'All', 'All', 'All', 'All', 'All'
-    
-    filters = parse_search_query(search_query)
-    
-    return (
-        filters['borough'] if filters['borough'] else 'All',
-        filters['year'] if filters['year'] else 'All',
-        filters['vehicle_type'] if filters['vehicle_type'] else 'All',
-        filters['contributing_factor'] if filters['contributing_factor'] else 'All',
-        filters['injury_type'] if filters['injury_type'] else 'All'
-    )
 
 @callback(
     [Output('visualizations-container', 'children'),
-     Output('summary-stats', 'children')],
+     Output('summary-stats', 'children'),
+     Output('report-filter-key', 'data')],
     Input('generate-report-btn', 'n_clicks'),
     State('borough-filter', 'value'),
     State('year-filter', 'value'),
@@ -667,22 +1176,7 @@ def update_visualizations(n_clicks, borough, year, vehicle_type, contributing_fa
     """
     # Error handling for empty dataset
     if df.empty or len(df) == 0:
-        return (
-            html.Div([
-                html.Div([
-                    html.H3("⚠️ No Data Available", style={'color': '#e74c3c'}),
-                    html.P("Please ensure the data file is located at: data/df_merged_clean.parquet",
-                          style={'color': '#7f8c8d'})
-                ], style={
-                    'textAlign': 'center',
-                    'padding': '50px',
-                    'backgroundColor': 'white',
-                    'borderRadius': '10px',
-                    'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
-                })
-            ]),
-            []
-        )
+        return NO_DATA_STATE, [], None
     
     # Collect filter values
     filters = {
@@ -695,53 +1189,79 @@ def update_visualizations(n_clicks, borough, year, vehicle_type, contributing_fa
     
     # Apply filters
     try:
-        filtered_df = apply_filters(df, filters)
+        key = filter_key(filters)
+        positions = _filtered_positions(*key)
     except Exception as e:
-        return (
-            html.Div([
-                html.Div([
-                    html.H3("❌ Error Applying Filters", style={'color': '#e74c3c'}),
-                    html.P(f"An error occurred: {str(e)}", style={'color': '#7f8c8d'})
-                ], style={
-                    'textAlign': 'center',
-                    'padding': '50px',
-                    'backgroundColor': 'white',
-                    'borderRadius': '10px'
-                })
-            ]),
-            []
-        )
+        log.exception("Error applying filters")
+        return empty_state("❌ Error Applying Filters", '#e74c3c', f"An error occurred: {str(e)}"), [], None
     
     # Handle empty filtered results
-    if len(filtered_df) == 0:
-        return (
-            html.Div([
-                html.Div([
-                    html.H3("📭 No Data Matches Filters", style={'color': '#f39c12'}),
-                    html.P("Try adjusting your filters or search criteria.", 
-                          style={'color': '#7f8c8d'})
-                ], style={
-                    'textAlign': 'center',
-                    'padding': '50px',
-                    'backgroundColor': 'white',
-                    'borderRadius': '10px',
-                    'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
-                })
-            ]),
-            []
-        )
-    
-    # Calculate summary statistics
-    summary_stats = calculate_summary_stats(filtered_df)
+    if positions is not None and len(positions) == 0:
+        return NO_MATCH_STATE, [], list(key)
     
-    # Generate all visualizations
-    visualizations = create_all_visualizations(filtered_df)
+    # Summary statistics and all visualizations (memoized per filter combination)
+    visualizations, summary_stats = build_report(key)
     
-    return visualizations, summary_stats
+    return visualizations, summary_stats, list(key)
+
+@callback(
+    Output('map-container', 'children'),
+    Input('report-filter-key', 'data'),
+    prevent_initial_call=True
+)
+def update_map(key):
+    """
+    Render the crash map for the report's stored filter key. Runs as a
+    separate request, so the cards and other charts show without waiting.
+    """
+    if key is None or df.empty:
+        return []
+    key = tuple(key)
+    positions = _filtered_positions(*key)
+    if positions is not None and len(positions) == 0:
+        return []
+    return build_map(key)
+
+def empty_state(title, color, message):
+    """Centered message panel shown in place of the charts (no data, errors)."""
+    return html.Div([
+        html.Div([
+            html.H3(title, style={'color': color}),
+            html.P(message, style={'color': '#7f8c8d'})
+        ], style={
+            'textAlign': 'center',
+            'padding': '50px',
+            'backgroundColor': 'white',
+            'borderRadius': '10px',
+            'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
+        })
+    ])
+
+# Fixed-text panels, built once
+NO_DATA_STATE = empty_state(
+    "⚠️ No Data Available", '#e74c3c',
+    "Please ensure the data is located at: data/df_merged_clean/ or data/df_merged_clean.parquet"
+)
+NO_MATCH_STATE = empty_state(
+    "📭 No Data Matches Filters", '#f39c12', "Try adjusting your filters or search criteria."
+)
+
+def stat_card(value, label, color):
+    """One summary statistic card: a large colored number over its label."""
+    return html.Div([
+        html.H2(value, className='stat-number', style={'color': color, 'margin': '0'}),
+        html.P(label, className='stat-label')
+    ], style={
+        'textAlign': 'center',
+        'padding': '20px',
+        'backgroundColor': 'white',
+        'borderRadius': '8px',
+        'boxShadow': '0 2px 4px rgba(0,0,0,0.1)'
+    })
 
-def calculate_summary_stats(filtered_df):
+def calculate_summary_stats(aggregates):
     """
-    Calculate key summary statistics for the filtered dataset.
+    Calculate key summary statistics from the chart aggregates.
     
     Returns:
         List of HTML Div elements containing stat cards
@@ -749,106 +1269,65 @@ def calculate_summary_stats(filtered_df):
     stats = []
     
     try:
-        total_crashes = len(filtered_df)
-        total_injured = filtered_df['TOTAL_INJURED'].sum() if 'TOTAL_INJURED' in filtered_df.columns else \
-                       filtered_df['NUMBER_OF_PERSONS_INJURED'].sum() if 'NUMBER_OF_PERSONS_INJURED' in filtered_df.columns else 0
-        total_killed = filtered_df['TOTAL_KILLED'].sum() if 'TOTAL_KILLED' in filtered_df.columns else \
-                      filtered_df['NUMBER_OF_PERSONS_KILLED'].sum() if 'NUMBER_OF_PERSONS_KILLED' in filtered_df.columns else 0
+        totals = aggregates['totals']
+        total_crashes = int(totals['crashes'])
+        total_injured = totals['TOTAL_INJURED'] if 'TOTAL_INJURED' in totals.index else \
+                       totals['NUMBER_OF_PERSONS_INJURED'] if 'NUMBER_OF_PERSONS_INJURED' in totals.index else 0
+        total_killed = totals['TOTAL_KILLED'] if 'TOTAL_KILLED' in totals.index else \
+                      totals['NUMBER_OF_PERSONS_KILLED'] if 'NUMBER_OF_PERSONS_KILLED' in totals.index else 0
         
         # Calculate average per crash
         avg_injured = total_injured / total_crashes if total_crashes > 0 else 0
         avg_killed = total_killed / total_crashes if total_crashes > 0 else 0
         
+        # One grid container with four flat cards keeps the serialized tree small
         stats = [
             html.Div([
-                html.Div([
-                    html.Div([
-                        html.Div([
-                            html.H2(f"{total_crashes:,}", className='stat-number',
-                                   style={'color': '#3498db', 'margin': '0'}),
-                            html.P("Total Crashes", className='stat-label')
-                        ], style={
-                            'textAlign': 'center',
-                            'padding': '20px',
-                            'backgroundColor': 'white',
-                            'borderRadius': '8px',
-                            'boxShadow': '0 2px 4px rgba(0,0,0,0.1)'
-                        })
-                    ], style={'width': '24%', 'display': 'inline-block', 'marginRight': '1%'}),
-                    
-                    html.Div([
-                        html.Div([
-                            html.H2(f"{int(total_injured):,}", className='stat-number',
-                                   style={'color': '#f39c12', 'margin': '0'}),
-                            html.P("Total Injured", className='stat-label')
-                        ], style={
-                            'textAlign': 'center',
-                            'padding': '20px',
-                            'backgroundColor': 'white',
-                            'borderRadius': '8px',
-                            'boxShadow': '0 2px 4px rgba(0,0,0,0.1)'
-                        })
-                    ], style={'width': '24%', 'display': 'inline-block', 'marginRight': '1%'}),
-                    
-                    html.Div([
-                        html.Div([
-                            html.H2(f"{int(total_killed):,}", className='stat-number',
-                                   style={'color': '#e74c3c', 'margin': '0'}),
-                            html.P("Total Killed", className='stat-label')
-                        ], style={
-                            'textAlign': 'center',
-                            'padding': '20px',
-                            'backgroundColor': 'white',
-                            'borderRadius': '8px',
-                            'boxShadow': '0 2px 4px rgba(0,0,0,0.1)'
-                        })
-                    ], style={'width': '24%', 'display': 'inline-block', 'marginRight': '1%'}),
-                    
-                    html.Div([
-                        html.Div([
-                            html.H2(f"{avg_injured:.2f}", className='stat-number',
-                                   style={'color': '#27ae60', 'margin': '0'}),
-                            html.P("Avg Injured/Crash", className='stat-label')
-                        ], style={
-                            'textAlign': 'center',
-                            'padding': '20px',
-                            'backgroundColor': 'white',
-                            'borderRadius': '8px',
-                            'boxShadow': '0 2px 4px rgba(0,0,0,0.1)'
-                        })
-                    ], style={'width': '24%', 'display': 'inline-block'})
-                ])
-            ], style={'marginBottom': '30px'})
+                stat_card(f"{total_crashes:,}", "Total Crashes", '#3498db'),
+                stat_card(f"{int(total_injured):,}", "Total Injured", '#f39c12'),
+                stat_card(f"{int(total_killed):,}", "Total Killed", '#e74c3c'),
+                stat_card(f"{avg_injured:.2f}", "Avg Injured/Crash", '#27ae60')
+            ], style={
+                'display': 'grid',
+                'gridTemplateColumns': 'repeat(4, 1fr)',
+                'gap': '1%',
+                'marginBottom': '30px'
+            })
         ]
-    except Exception as e:
-        print(f"Error calculating summary stats: {e}")
+    except Exception:
+        log.exception("Error calculating summary stats")
     
     return stats
 
-def create_all_visualizations(filtered_df):
+def create_all_visualizations(aggregates):
     """
-    Create all visualization charts based on filtered data.
+    Create all aggregate-based visualization charts (the map is rendered
+    separately by create_map_visualization).
     
     Returns:
         List of HTML Div elements containing dcc.Graph components
     """
     visualizations = []
+    # Aggregate tables bound once; the traces take their index/values
+    # arrays directly instead of reset_index() copies
+    totals = aggregates['totals']
+    year_table = aggregates.get('year')
     
     # 1. Bar Chart: Crashes by Borough
-    if 'BOROUGH' in filtered_df.columns and len(filtered_df['BOROUGH'].dropna()) > 0:
+    if 'borough' in aggregates and len(aggregates['borough']) > 0:
         try:
-            borough_counts = filtered_df['BOROUGH'].value_counts().reset_index()
-            borough_counts.columns = ['BOROUGH', 'Count']
-            fig_bar = px.bar(
-                borough_counts, 
-                x='BOROUGH', 
-                y='Count',
-                title='📊 Crashes by Borough',
-                labels={'Count': 'Number of Crashes', 'BOROUGH': 'Borough'},
-                color='Count',
-                color_continuous_scale='Blues'
-            )
+            borough_counts = aggregates['borough'].sort_values(ascending=False)
+            counts = borough_counts.to_numpy()
+            fig_bar = go.Figure(go.Bar(
+                x=borough_counts.index.to_numpy(),
+                y=counts,
+                marker=dict(color=counts, colorscale='Blues', showscale=True,
+                            colorbar=dict(title='Number of Crashes'))
+            ))
             fig_bar.update_layout(
+                title='📊 Crashes by Borough',
+                xaxis_title='Borough',
+                yaxis_title='Number of Crashes',
                 showlegend=False,
                 template='plotly_white',
                 height=400,
@@ -865,24 +1344,23 @@ def create_all_visualizations(filtered_df):
                     'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
                 })
             )
-        except Exception as e:
-            print(f"Error creating borough chart: {e}")
+        except Exception:
+            log.exception("Error creating borough chart")
     
     # 2. Line Chart: Crashes Over Time by Year
-    if 'CRASH_YEAR' in filtered_df.columns and len(filtered_df['CRASH_YEAR'].dropna()) > 0:
+    if year_table is not None and len(year_table) > 0:
         try:
-            year_counts = filtered_df.groupby('CRASH_YEAR').size().reset_index()
-            year_counts.columns = ['Year', 'Count']
-            fig_line = px.line(
-                year_counts, 
-                x='Year', 
-                y='Count',
-                title='📈 Crashes Over Time',
-                labels={'Count': 'Number of Crashes', 'Year': 'Year'},
-                markers=True
-            )
-            fig_line.update_traces(line_color='#3498db', line_width=3, marker_size=8)
+            fig_line = go.Figure(go.Scatter(
+                x=year_table.index.to_numpy(),
+                y=year_table['crashes'].to_numpy(),
+                mode='lines+markers',
+                line=dict(color='#3498db', width=3),
+                marker=dict(size=8)
+            ))
             fig_line.update_layout(
+                title='📈 Crashes Over Time',
+                xaxis_title='Year',
+                yaxis_title='Number of Crashes',
                 template='plotly_white',
                 height=400,
                 margin=dict(l=20, r=20, t=60, b=20)
@@ -898,29 +1376,26 @@ def create_all_visualizations(filtered_df):
                     'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
                 })
             )
-        except Exception as e:
-            print(f"Error creating time series chart: {e}")
+        except Exception:
+            log.exception("Error creating time series chart")
     
     # 3. Injuries and Fatalities Trends
-    if 'CRASH_YEAR' in filtered_df.columns:
+    if year_table is not None:
         try:
-            if 'TOTAL_INJURED' in filtered_df.columns and 'TOTAL_KILLED' in filtered_df.columns:
-                year_trends = filtered_df.groupby('CRASH_YEAR').agg({
-                    'TOTAL_INJURED': 'sum',
-                    'TOTAL_KILLED': 'sum'
-                }).reset_index()
+            if HAS_TOTALS:
+                years = year_table.index.to_numpy()
                 
                 fig_trends = go.Figure()
                 fig_trends.add_trace(go.Scatter(
-                    x=year_trends['CRASH_YEAR'],
-                    y=year_trends['TOTAL_INJURED'],
+                    x=years,
+                    y=year_table['TOTAL_INJURED'].to_numpy(),
                     name='Injured',
                     line=dict(color='#f39c12', width=3),
                     mode='lines+markers'
                 ))
                 fig_trends.add_trace(go.Scatter(
-                    x=year_trends['CRASH_YEAR'],
-                    y=year_trends['TOTAL_KILLED'] * 100,  # Scale for visibility
+                    x=years,
+                    y=year_table['TOTAL_KILLED'].to_numpy() * 100,  # Scale for visibility
                     name='Killed (×100)',
                     line=dict(color='#e74c3c', width=3),
                     mode='lines+markers'
@@ -945,49 +1420,38 @@ def create_all_visualizations(filtered_df):
                         'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
                     })
                 )
-        except Exception as e:
-            print(f"Error creating trends chart: {e}")
+        except Exception:
+            log.exception("Error creating trends chart")
     
     # 4. Pie Chart: Injury Type Distribution
     try:
         injury_data = []
-        if 'NUMBER_OF_PEDESTRIANS_INJURED' in filtered_df.columns:
-            pedestrian_count = ((filtered_df['NUMBER_OF_PEDESTRIANS_INJURED'] > 0) | 
-                               (filtered_df['NUMBER_OF_PEDESTRIANS_KILLED'] > 0)).sum()
-            if pedestrian_count > 0:
-                injury_data.append({'Type': 'Pedestrian', 'Count': pedestrian_count})
-        
-        if 'NUMBER_OF_CYCLIST_INJURED' in filtered_df.columns:
-            cyclist_count = ((filtered_df['NUMBER_OF_CYCLIST_INJURED'] > 0) |
-                            (filtered_df['NUMBER_OF_CYCLIST_KILLED'] > 0)).sum()
-            if cyclist_count > 0:
-                injury_data.append({'Type': 'Cyclist', 'Count': cyclist_count})
-        
-        if 'NUMBER_OF_MOTORIST_INJURED' in filtered_df.columns:
-            motorist_count = ((filtered_df['NUMBER_OF_MOTORIST_INJURED'] > 0) |
-                             (filtered_df['NUMBER_OF_MOTORIST_KILLED'] > 0)).sum()
-            if motorist_count > 0:
-                injury_data.append({'Type': 'Motorist', 'Count': motorist_count})
+        for injury_type, (flag, _, _) in INJURY_FLAGS.items():
+            if flag in totals.index:
+                injury_count = int(totals[flag])
+                if injury_count > 0:
+                    injury_data.append({'Type': injury_type, 'Count': injury_count})
         
         if injury_data:
             injury_df = pd.DataFrame(injury_data)
-            fig_pie = px.pie(
-                injury_df, 
-                values='Count', 
-                names='Type',
-                title='🥧 Injury Type Distribution',
-                color_discrete_map={
-                    'Pedestrian': '#3498db',
-                    'Cyclist': '#27ae60',
-                    'Motorist': '#e74c3c'
-                }
-            )
+            injury_colors = {
+                'Pedestrian': '#3498db',
+                'Cyclist': '#27ae60',
+                'Motorist': '#e74c3c'
+            }
+            fig_pie = go.Figure(go.Pie(
+                labels=injury_df['Type'],
+                values=injury_df['Count'],
+                marker=dict(colors=[injury_colors[t] for t in injury_df['Type']]),
+                textposition='inside',
+                textinfo='percent+label'
+            ))
             fig_pie.update_layout(
+                title='🥧 Injury Type Distribution',
                 template='plotly_white',
                 height=400,
                 margin=dict(l=20, r=20, t=60, b=20)
             )
-            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
             visualizations.append(
                 html.Div([
                     dcc.Graph(figure=fig_pie)
@@ -999,24 +1463,33 @@ def create_all_visualizations(filtered_df):
                     'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
                 })
             )
-    except Exception as e:
-        print(f"Error creating pie chart: {e}")
+    except Exception:
+        log.exception("Error creating pie chart")
     
     # 5. Heatmap: Crashes by Hour and Weekday
-    if 'CRASH_HOUR' in filtered_df.columns and 'CRASH_WEEKDAY' in filtered_df.columns:
+    if 'hour_weekday' in aggregates:
         try:
-            hour_weekday = filtered_df.groupby(['CRASH_HOUR', 'CRASH_WEEKDAY']).size().reset_index()
-            hour_weekday.columns = ['Hour', 'Weekday', 'Count']
+            hour_weekday = aggregates['hour_weekday']
             if len(hour_weekday) > 0:
-                pivot_table = hour_weekday.pivot(index='Weekday', columns='Hour', values='Count').fillna(0)
-                fig_heatmap = px.imshow(
-                    pivot_table,
-                    labels=dict(x='Hour of Day', y='Weekday', color='Number of Crashes'),
-                    title='🔥 Crashes by Hour and Weekday',
-                    color_continuous_scale='Reds',
-                    aspect='auto'
-                )
+                # Scatter the counts into a zero-filled weekday x hour grid
+                # (rows and columns in sorted order, as a pivot would give)
+                hour_codes, hours = pd.factorize(hour_weekday.index.get_level_values('CRASH_HOUR'), sort=True)
+                weekday_codes, weekdays = pd.factorize(hour_weekday.index.get_level_values('CRASH_WEEKDAY'), sort=True)
+                known = (hour_codes >= 0) & (weekday_codes >= 0)
+                grid = np.zeros((len(weekdays), len(hours)), dtype=np.int64)
+                grid[weekday_codes[known], hour_codes[known]] = hour_weekday.to_numpy()[known]
+                fig_heatmap = go.Figure(go.Heatmap(
+                    z=grid,
+                    x=np.asarray(hours),
+                    y=np.asarray(weekdays),
+                    colorscale='Reds',
+                    colorbar=dict(title='Number of Crashes')
+                ))
                 fig_heatmap.update_layout(
+                    title='🔥 Crashes by Hour and Weekday',
+                    xaxis_title='Hour of Day',
+                    # Top-to-bottom weekday rows, as an image would draw them
+                    yaxis=dict(title='Weekday', autorange='reversed'),
                     template='plotly_white',
                     height=500,
                     margin=dict(l=20, r=20, t=60, b=20)
@@ -1032,91 +1505,32 @@ def create_all_visualizations(filtered_df):
                         'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
                     })
                 )
-        except Exception as e:
-            print(f"Error creating heatmap: {e}")
-    
-    # 6. Map: Crash Locations (NYC Map)
-    if 'LATITUDE' in filtered_df.columns and 'LONGITUDE' in filtered_df.columns:
-        try:
-            map_df = filtered_df[
-                filtered_df['LATITUDE'].notna() & 
-                filtered_df['LONGITUDE'].notna() &
-                (filtered_df['LATITUDE'] != 0) &
-                (filtered_df['LONGITUDE'] != 0)
-            ].copy()
-            
-            if len(map_df) > 0:
-                # Sample for performance if too many points
-                max_points = 2000
-                if len(map_df) > max_points:
-                    map_df = map_df.sample(n=max_points, random_state=42)
-                
-                # Add size based on severity
-                if 'TOTAL_INJURED' in map_df.columns:
-                    map_df['size'] = map_df['TOTAL_INJURED'] + map_df.get('TOTAL_KILLED', 0) * 10 + 1
-                else:
-                    map_df['size'] = 3
-                
-                fig_map = px.scatter_mapbox(
-                    map_df,
-                    lat='LATITUDE',
-                    lon='LONGITUDE',
-                    size='size',
-                    hover_data=['BOROUGH', 'CRASH_YEAR', 'TOTAL_INJURED'] if 'TOTAL_INJURED' in map_df.columns else ['BOROUGH', 'CRASH_YEAR'],
-                    color_discrete_sequence=['#e74c3c'],
-                    zoom=10,
-                    height=600,
-                    title='🗺️ Crash Locations Map (NYC)'
-                )
-                fig_map.update_layout(
-                    mapbox_style='open-street-map',
-                    margin=dict(l=0, r=0, t=40, b=0),
-                    mapbox=dict(
-                        center=dict(lat=40.7128, lon=-74.0060)  # NYC coordinates
-                    )
-                )
-                fig_map.update_traces(marker=dict(sizemode='diameter', sizeref=2))
-                visualizations.append(
-                    html.Div([
-                        dcc.Graph(figure=fig_map)
-                    ], style={
-                        'marginBottom': '30px',
-                        'backgroundColor': 'white',
-                        'padding': '20px',
-                        'borderRadius': '10px',
-                        'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
-                    })
-                )
-        except Exception as e:
-            print(f"Error creating map: {e}")
+        except Exception:
+            log.exception("Error creating heatmap")
     
     # 7. Bar Chart: Top Contributing Factors
-    if 'CONTRIBUTING_FACTOR_VEHICLE_1' in filtered_df.columns:
+    if 'factors' in aggregates:
         try:
-            factors = pd.concat([
-                filtered_df['CONTRIBUTING_FACTOR_VEHICLE_1'],
-                filtered_df['CONTRIBUTING_FACTOR_VEHICLE_2']
-            ]).dropna()
-            factors = factors[factors != 'Unspecified']
+            factors = aggregates['factors']
+            factors = factors[(factors.index != 'Unspecified') & (factors > 0)]
             
             if len(factors) > 0:
-                factor_counts = factors.value_counts().head(10).reset_index()
-                factor_counts.columns = ['Factor', 'Count']
-                fig_factors = px.bar(
-                    factor_counts, 
-                    x='Count', 
-                    y='Factor',
+                factor_counts = factors.sort_values(ascending=False).head(10)
+                counts = factor_counts.to_numpy()
+                fig_factors = go.Figure(go.Bar(
+                    x=counts,
+                    y=factor_counts.index.to_numpy(),
                     orientation='h',
-                    title='⚠️ Top 10 Contributing Factors',
-                    labels={'Count': 'Number of Crashes', 'Factor': 'Contributing Factor'},
-                    color='Count',
-                    color_continuous_scale='Oranges'
-                )
+                    marker=dict(color=counts, colorscale='Oranges', showscale=True,
+                                colorbar=dict(title='Number of Crashes'))
+                ))
                 fig_factors.update_layout(
+                    title='⚠️ Top 10 Contributing Factors',
+                    xaxis_title='Number of Crashes',
                     template='plotly_white',
                     height=500,
                     margin=dict(l=150, r=20, t=60, b=20),
-                    yaxis={'categoryorder': 'total ascending'}
+                    yaxis={'title': 'Contributing Factor', 'categoryorder': 'total ascending'}
                 )
                 visualizations.append(
                     html.Div([
@@ -1129,37 +1543,28 @@ def create_all_visualizations(filtered_df):
                         'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
                     })
                 )
-        except Exception as e:
-            print(f"Error creating contributing factors chart: {e}")
+        except Exception:
+            log.exception("Error creating contributing factors chart")
     
     # 8. Monthly Pattern Chart
-    if 'CRASH_MONTH' in filtered_df.columns and len(filtered_df['CRASH_MONTH'].dropna()) > 0:
+    if 'month' in aggregates and len(aggregates['month']) > 0:
         try:
-            month_counts = filtered_df.groupby('CRASH_MONTH').size().reset_index()
-            month_counts.columns = ['Month', 'Count']
-            month_order = ['January', 'February', 'March', 'April', 'May', 'June',
-                          'July', 'August', 'September', 'October', 'November', 'December']
-            # If month is numeric, map to names
-            if month_counts['Month'].dtype in ['int64', 'float64']:
-                month_map = {i+1: name for i, name in enumerate(month_order)}
-                month_counts['Month'] = month_counts['Month'].map(month_map)
-            month_counts = month_counts.sort_values('Month', key=lambda x: x.map(
-                {name: i for i, name in enumerate(month_order)}))
-            
-            fig_month = px.bar(
-                month_counts,
-                x='Month',
-                y='Count',
-                title='📅 Crashes by Month',
-                labels={'Count': 'Number of Crashes', 'Month': 'Month'},
-                color='Count',
-                color_continuous_scale='Viridis'
-            )
+            month_counts = aggregates['month']
+            counts = month_counts.to_numpy()
+            # Months are ordered categoricals, so the counts are already in calendar order
+            fig_month = go.Figure(go.Bar(
+                x=month_counts.index.astype(str).to_numpy(),
+                y=counts,
+                marker=dict(color=counts, colorscale='Viridis', showscale=True,
+                            colorbar=dict(title='Number of Crashes'))
+            ))
             fig_month.update_layout(
+                title='📅 Crashes by Month',
+                yaxis_title='Number of Crashes',
                 template='plotly_white',
                 height=400,
                 margin=dict(l=20, r=20, t=60, b=20),
-                xaxis={'tickangle': -45}
+                xaxis={'title': 'Month', 'tickangle': -45}
             )
             visualizations.append(
                 html.Div([
@@ -1172,24 +1577,66 @@ def create_all_visualizations(filtered_df):
                     'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
                 })
             )
-        except Exception as e:
-            print(f"Error creating monthly chart: {e}")
+        except Exception:
+            log.exception("Error creating monthly chart")
     
     # If no visualizations were created, show message
     if not visualizations:
-        return html.Div([
-            html.Div([
-                html.H3("⚠️ Unable to Create Visualizations", style={'color': '#e74c3c'}),
-                html.P("The data may be missing required columns or there may be an issue with the dataset.",
-                      style={'color': '#7f8c8d'})
-            ], style={
-                'textAlign': 'center',
-                'padding': '50px',
-                'backgroundColor': 'white',
-                'borderRadius': '10px',
-                'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
-            })
-        ])
+        return empty_state(
+            "⚠️ Unable to Create Visualizations", '#e74c3c',
+            "The data may be missing required columns or there may be an issue with the dataset."
+        )
+    
+    return visualizations
+
+def create_map_visualization(map_df):
+    """
+    Create the crash location map from the map grid cells (see
+    get_map_cells). Rendered by its own callback so the other charts do not
+    wait for it.
+    
+    Returns:
+        List with the map's HTML Div, or an empty list
+    """
+    visualizations = []
+    
+    # 6. Map: Crash Locations (NYC Map)
+    # Every crash is binned server-side; only the occupied cells are sent
+    if len(map_df) > 0:
+        try:
+            fig_map = go.Figure(go.Densitymapbox(
+                lat=map_df['LATITUDE'],
+                lon=map_df['LONGITUDE'],
+                z=map_df['Severity'],
+                customdata=map_df['Crashes'],
+                radius=8,
+                colorscale='Reds',
+                colorbar=dict(title='Severity'),
+                hovertemplate='Crashes: %{customdata:,}<br>Severity: %{z:,.0f}<extra></extra>'
+            ))
+            fig_map.update_layout(
+                title='🗺️ Crash Locations Map (NYC)',
+                height=600,
+                mapbox_style='open-street-map',
+                margin=dict(l=0, r=0, t=40, b=0),
+                mapbox=dict(
+                    center=dict(lat=40.7128, lon=-74.0060),  # NYC coordinates
+                    zoom=10
+                )
+            )
+            visualizations.append(
+                html.Div([
+                    dcc.Graph(figure=fig_map)
+                ], style={
+                    'marginBottom': '30px',
+                    'backgroundColor': 'white',
+                    'padding': '20px',
+                    'borderRadius': '10px',
+                    'boxShadow': '0 2px 10px rgba(0,0,0,0.1)'
+                })
+            )
+        except Exception:
+            log.exception("Error creating map")
     
     return visualizations
 
@@ -1198,4 +1645,5 @@ def create_all_visualizations(filtered_df):
 # ============================================================================
 
 if __name__ == '__main__':
-    app.run_server(debug=True, host='0.0.0.0', port=8080)
+    # Development server only; deployments run gunicorn (see gunicorn.conf.py)
+    app.run_server(debug=False, host='0.0.0.0', port=8080)
@@ -1,13 +1,140 @@
-import pandas as pd
+import json
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from filter_options import (
+    DROPDOWN_OPTIONS_PATH, INJURY_FLAGS, OPTION_COLUMNS, get_dropdown_options, parse_number_column,
+    valid_year_filter
+)
 
 csv_path = "data/df_merged_clean.csv"   # Path to your big CSV
-parquet_path = "data/df_merged_clean.parquet"
+# Hive-partitioned by borough (BOROUGH=BROOKLYN/part-0.parquet, ...), so
+# borough-filtered scans never open the other boroughs' files
+parquet_path = "data/df_merged_clean"
+PARTITION_COLS = ['BOROUGH']
+
+# Rows per row group: large enough for good compression, small enough
+# that per-row-group min/max statistics can skip data when filtering
+ROW_GROUP_SIZE = 1_000_000
+
+# Free-text columns trimmed before writing, so values differing only in
+# surrounding whitespace are stored (and counted) as one
+TRIM_COLS = [
+    'VEHICLE_TYPE_CODE_1', 'VEHICLE_TYPE_CODE_2',
+    'CONTRIBUTING_FACTOR_VEHICLE_1', 'CONTRIBUTING_FACTOR_VEHICLE_2'
+]
+
+def trim_text_columns(table):
+    """Strip surrounding whitespace from the string columns in TRIM_COLS."""
+    for col in TRIM_COLS:
+        if col in table.column_names and pa.types.is_string(table.schema.field(col).type):
+            idx = table.column_names.index(col)
+            table = table.set_column(idx, col, pc.utf8_trim_whitespace(table[col]))
+    return table
+
+# Count columns with stray text ('Unknown') in the CSV: read as strings, then
+# parsed to float32 here so the app loads them as plain numbers
+TEXT_COUNT_COLS = ['NUMBER_OF_PERSONS_INJURED', 'NUMBER_OF_PERSONS_KILLED']
 
-print("Loading CSV... Please wait.")
-df = pd.read_csv(csv_path, low_memory=False)
+def parse_count_columns(table):
+    """Parse the TEXT_COUNT_COLS string columns into float32 (non-numbers become null)."""
+    for col in TEXT_COUNT_COLS:
+        if col in table.column_names:
+            idx = table.column_names.index(col)
+            table = table.set_column(idx, col, parse_number_column(table[col]).cast(pa.float32()))
+    return table
+
+def add_injury_flags(table):
+    """Append one bool column per injury type (any injured or killed)."""
+    for flag, injured, killed in INJURY_FLAGS.values():
+        if injured in table.column_names and killed in table.column_names:
+            involved = pc.or_(pc.greater(table[injured], 0), pc.greater(table[killed], 0))
+            table = table.append_column(flag, pc.fill_null(involved, False))
+    return table
+
+print("Opening CSV stream... Please wait.")
+reader = csv.open_csv(
+    csv_path,
+    read_options=csv.ReadOptions(block_size=64 << 20),  # 64MB blocks
+    # Types are inferred from the first block only, so columns that mix
+    # numbers with text further down the file are pinned explicitly
+    convert_options=csv.ConvertOptions(column_types={
+        'ZIP_CODE': pa.string(),
+        'NUMBER_OF_PERSONS_INJURED': pa.string(),
+        'NUMBER_OF_PERSONS_KILLED': pa.string(),
+        # Narrow numeric types so the file (and every load) moves fewer bytes
+        'CRASH_YEAR': pa.int16(),
+        'CRASH_HOUR': pa.uint8(),
+        'CRASH_DAY': pa.uint8(),
+        'CRASH_MONTH': pa.uint8(),
+        'NUMBER_OF_PEDESTRIANS_INJURED': pa.uint16(),
+        'NUMBER_OF_PEDESTRIANS_KILLED': pa.uint16(),
+        'NUMBER_OF_CYCLIST_INJURED': pa.uint16(),
+        'NUMBER_OF_CYCLIST_KILLED': pa.uint16(),
+        'NUMBER_OF_MOTORIST_INJURED': pa.uint16(),
+        'NUMBER_OF_MOTORIST_KILLED': pa.uint16(),
+        'TOTAL_INJURED': pa.uint16(),
+        'TOTAL_KILLED': pa.uint16(),
+        'LATITUDE': pa.float32(),
+        'LONGITUDE': pa.float32(),
+        'BOROUGH': pa.dictionary(pa.int32(), pa.string()),
+        'CRASH_WEEKDAY': pa.dictionary(pa.int32(), pa.string())
+    })
+)
 
 print("Saving as Parquet (this will compress the file)...")
-df.to_parquet(parquet_path, index=False)
+# Schema as written: the CSV columns (counts parsed) plus the precomputed injury flags
+schema = add_injury_flags(parse_count_columns(reader.schema.empty_table())).schema
+# Rows with an out-of-range CRASH_YEAR are dropped here, once, so the app
+# never has to validate years at startup
+year_filter = valid_year_filter(reader.schema)
+
+def flagged_batches():
+    # Streamed one CSV block at a time; the writer buffers rows per partition
+    # until a full row group is ready, so memory stays bounded
+    for batch in reader:
+        table = pa.Table.from_batches([batch])
+        if year_filter is not None:
+            table = table.filter(year_filter)
+        yield from add_injury_flags(parse_count_columns(trim_text_columns(table))).to_batches()
+
+ds.write_dataset(
+    flagged_batches(),
+    parquet_path,
+    schema=schema,
+    format='parquet',
+    partitioning=ds.partitioning(schema.empty_table().select(PARTITION_COLS).schema, flavor='hive'),
+    # Smaller pages plus a page index (per-page min/max) let readers skip
+    # pages inside a row group, not just whole row groups
+    file_options=ds.ParquetFileFormat().make_write_options(
+        compression='zstd',
+        use_dictionary=True,
+        data_page_size=256 << 10,
+        write_statistics=True,
+        write_page_index=True
+    ),
+    basename_template='part-{i}.parquet',
+    min_rows_per_group=ROW_GROUP_SIZE,
+    max_rows_per_group=ROW_GROUP_SIZE,
+    existing_data_behavior='delete_matching'
+)
+
+print("Precomputing dropdown filter options...")
+# Only the filter columns are read back, strings as dictionaries
+option_columns = [col for col in OPTION_COLUMNS if col in reader.schema.names]
+options_df = pq.read_table(
+    parquet_path,
+    columns=option_columns,
+    partitioning='hive',
+    read_dictionary=[col for col in option_columns if col not in PARTITION_COLS + ['CRASH_YEAR']]
+).to_pandas()
+with open(DROPDOWN_OPTIONS_PATH, 'w', encoding='utf-8') as f:
+    json.dump(get_dropdown_options(options_df), f, ensure_ascii=False, indent=2)
 
 print("DONE! File converted successfully!")
 print("Saved as:", parquet_path)
+print("Dropdown options saved as:", DROPDOWN_OPTIONS_PATH)
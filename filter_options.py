@@ -0,0 +1,160 @@
+"""
+Dropdown filter options and filter definitions for the NYC crash dashboard.
+Shared by the app and by convert_to_parquet.py, which precomputes the
+options, injury flags and column cleanup once per dataset.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DROPDOWN_OPTIONS_PATH = os.path.join('data', 'dropdown_options.json')
+
+# Columns get_dropdown_options reads
+OPTION_COLUMNS = [
+    'BOROUGH', 'CRASH_YEAR', 'VEHICLE_TYPE_CODE_1', 'VEHICLE_TYPE_CODE_2',
+    'CONTRIBUTING_FACTOR_VEHICLE_1', 'CONTRIBUTING_FACTOR_VEHICLE_2'
+]
+
+# Injury type -> (precomputed flag column, injured count column, killed count column)
+INJURY_FLAGS = {
+    'Pedestrian': ('IS_PED_INVOLVED', 'NUMBER_OF_PEDESTRIANS_INJURED', 'NUMBER_OF_PEDESTRIANS_KILLED'),
+    'Cyclist': ('IS_CYCLIST_INVOLVED', 'NUMBER_OF_CYCLIST_INJURED', 'NUMBER_OF_CYCLIST_KILLED'),
+    'Motorist': ('IS_MOTORIST_INVOLVED', 'NUMBER_OF_MOTORIST_INJURED', 'NUMBER_OF_MOTORIST_KILLED')
+}
+
+def valid_year_filter(schema):
+    """
+    Build the CRASH_YEAR sanity predicate (null or 1900-2100) as a pyarrow
+    expression. Returns None when the year column is missing or not stored
+    as integers.
+    """
+    if 'CRASH_YEAR' not in schema.names or not pa.types.is_integer(schema.field('CRASH_YEAR').type):
+        return None
+    year = pc.field('CRASH_YEAR')
+    return year.is_null() | ((year >= 1900) & (year <= 2100))
+
+def parse_number_column(arr):
+    """
+    Parse a string column into float64 with pyarrow kernels, turning
+    values that are not plain numbers (e.g. 'Unknown') into nulls.
+    Non-string columns are returned unchanged.
+    """
+    if not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        return arr
+    arr = pc.utf8_trim_whitespace(arr)
+    is_number = pc.match_substring_regex(arr, r'^[-+]?(\d+\.?\d*|\.\d+)$')
+    return pc.if_else(is_number, arr, pa.scalar(None, arr.type)).cast(pa.float64())
+
+def distinct_values(series):
+    """
+    Non-null distinct values of a column. Categorical columns answer from
+    their (small) categories array instead of scanning every row.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return np.asarray(series.cat.categories, dtype=object)
+    return np.asarray(series.dropna().unique(), dtype=object)
+
+def value_counts_by_name(series):
+    """Non-zero value counts of a column, indexed by plain (non-categorical) values."""
+    counts = series.value_counts()
+    counts = counts[counts > 0]
+    return pd.Series(counts.to_numpy(), index=counts.index.astype(object))
+
+def get_dropdown_options(df):
+    """
+    Extract unique values from dataframe for dropdown filter options.
+    Handles missing columns gracefully.
+    
+    Returns:
+        dict: Options for each filter type
+    """
+    options = {
+        'boroughs': [], 'years': [], 'vehicle_types': [],
+        'contributing_factors': [], 'injury_types': ['All', 'Pedestrian', 'Cyclist', 'Motorist']
+    }
+    
+    if df.empty:
+        return options
+    
+    # Boroughs
+    if 'BOROUGH' in df.columns:
+        boroughs = [b for b in df['BOROUGH'].dropna().unique() if b and str(b).strip()]
+        options['boroughs'] = sorted(boroughs)
+    
+    # Years - handle various data types
+    if 'CRASH_YEAR' in df.columns:
+        years_list = []
+        for y in df['CRASH_YEAR'].dropna().unique():
+            try:
+                # Convert to numeric first
+                year_val = pd.to_numeric(y, errors='coerce')
+                if pd.notna(year_val) and year_val >= 1900 and year_val <= 2100:
+                    years_list.append(int(year_val))
+            except:
+                continue
+        options['years'] = sorted(list(set(years_list)))  # Remove duplicates and sort
+    
+    # Vehicle types - filter to show only valid, common vehicle types
+    if 'VEHICLE_TYPE_CODE_1' in df.columns:
+        # Get value counts to prioritize common vehicle types, summed per
+        # column on the (small) count index instead of concatenating the columns
+        vehicle_counts = value_counts_by_name(df['VEHICLE_TYPE_CODE_1'])
+        if 'VEHICLE_TYPE_CODE_2' in df.columns:
+            vehicle_counts = vehicle_counts.add(value_counts_by_name(df['VEHICLE_TYPE_CODE_2']), fill_value=0)
+        vehicle_counts = vehicle_counts.astype('int64').sort_values(ascending=False, kind='stable')
+        
+        # Work on the unique names only, with string predicates vectorized
+        names = vehicle_counts.index.to_series(index=range(len(vehicle_counts))).astype(str).str.strip()
+        counts = vehicle_counts.reindex(names).fillna(0).to_numpy()
+        
+        # Filter for valid vehicle types: at least 4 chars, at least 2 letters,
+        # not starting with a digit, quote or parenthesis (likely corrupted)
+        invalid_patterns = ['', 'nan', 'None', 'Unknown', '-', '.', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9']
+        valid = (
+            (names.str.len() >= 4) &
+            ~names.isin(invalid_patterns) &
+            ~names.str.match(r"[\d'(]") &
+            (names.str.count(r'[^\W\d_]') >= 2)
+        )
+        candidates = pd.DataFrame({'name': names[valid], 'count': counts[valid.to_numpy()]})
+        candidates = candidates.drop_duplicates('name')
+        
+        # Remove case-insensitive duplicates (keep the most common version)
+        best = candidates.groupby(candidates['name'].str.lower(), sort=False)['count'].idxmax()
+        deduplicated = candidates.loc[best]
+        
+        # Sort by frequency (most common first), then alphabetically
+        # Limit to top 50 most common valid types
+        sorted_types = deduplicated.sort_values(['count', 'name'], ascending=False)['name'].head(50)
+        options['vehicle_types'] = sorted(sorted_types.tolist())  # Final alphabetical sort
+    
+    # Contributing factors - filter out invalid entries and ensure proper encoding
+    if 'CONTRIBUTING_FACTOR_VEHICLE_1' in df.columns:
+        f1 = distinct_values(df['CONTRIBUTING_FACTOR_VEHICLE_1'])
+        f2 = distinct_values(df['CONTRIBUTING_FACTOR_VEHICLE_2']) if 'CONTRIBUTING_FACTOR_VEHICLE_2' in df.columns else f1[:0]
+        factors = []
+        invalid_patterns = ['', 'nan', 'None', 'Unspecified', 'Unknown', '-', '.', '0', '1', '2']
+        for f in np.union1d(f1, f2):
+            if pd.notna(f):
+                f_str = str(f).strip()
+                # Filter out: empty, numbers only, single characters, and invalid patterns
+                if (f_str and 
+                    f_str not in invalid_patterns and
+                    len(f_str) > 3 and  # Must be at least 4 characters (reasonable text)
+                    not f_str.isdigit() and  # Not just numbers
+                    any(c.isalpha() for c in f_str)):  # Must contain at least one letter
+                    # Ensure proper encoding
+                    try:
+                        f_encoded = f_str.encode('utf-8', errors='ignore').decode('utf-8')
+                        if f_encoded:
+                            factors.append(f_encoded)
+                    except:
+                        pass
+        # Remove duplicates and sort
+        options['contributing_factors'] = sorted(list(set(factors)))
+    
+    return options
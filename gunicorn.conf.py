@@ -0,0 +1,12 @@
+# Gunicorn settings, picked up automatically from the working directory
+# (Procfile, Dockerfile and render.yaml all start `gunicorn app:server`)
+import os
+
+# Import app.py once in the master and fork the workers from it, so the
+# dataset, row-position index and aggregate cubes are loaded once and
+# shared copy-on-write instead of rebuilt in every worker
+preload_app = True
+
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"